@@ -7,12 +7,18 @@ Integrates screenshot parsing, log monitoring, and interactive maps.
 
 import streamlit as st
 import os
-import time
 from pathlib import Path
+from typing import NamedTuple
 import yaml
 
+# Prefer the libyaml C parser when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
 # Import our custom modules
-from screenshot_parser import ScreenshotParser, get_latest_position
+from screenshot_parser import ScreenshotParser, ScreenshotWatcher, get_latest_position
 from log_monitor import TarkovLogMonitor, create_monitor
 from tarkov_api import TarkovAPI, get_active_quests
 from map_renderer import MapRenderer
@@ -59,120 +65,105 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-@st.cache_resource
+class AppConfig(NamedTuple):
+    """Flattened config.yaml values read on every rerun."""
+    default_map: str
+    cache_ttl: int
+    auto_refresh_interval: int
+    screenshot_path: str
+    log_path: str
+
+
+@st.cache_data
 def load_config():
     """Load configuration from config.yaml."""
     config_path = Path("config.yaml")
     if config_path.exists():
         with open(config_path, 'r') as f:
-            return yaml.safe_load(f)
+            return yaml.load(f, Loader=YamlLoader)
     return None
 
 
+@st.cache_data
+def get_config_values() -> AppConfig:
+    """Get configuration as flat scalars, falling back to defaults."""
+    config = load_config() or {}
+    app_config = config.get('app') or {}
+    eft_config = config.get('eft') or {}
+    return AppConfig(
+        default_map=app_config.get('default_map', 'customs'),
+        cache_ttl=app_config.get('cache_ttl', 300),
+        auto_refresh_interval=app_config.get('auto_refresh_interval', 2),
+        screenshot_path=eft_config.get('screenshot_path', ''),
+        log_path=eft_config.get('log_path', ''),
+    )
+
+
 @st.cache_resource
 def get_api_client():
-    """Get cached API client instance."""
-    config = load_config()
-    cache_ttl = 300
-    if config and 'app' in config:
-        cache_ttl = config['app'].get('cache_ttl', 300)
-    return TarkovAPI(cache_ttl=cache_ttl)
+    """Get cached API client instance, warmed with maps and quests."""
+    api = TarkovAPI(cache_ttl=get_config_values().cache_ttl, cache_dir="map_cache")
+    api.prefetch()
+    return api
 
 
-def main():
-    """Main application entry point."""
+# Cache tiers for API data: the map list is close to static, quest data
+# changes rarely. Reruns within these windows never touch the API client.
+LONG_CACHE_TTL = 60
+NORMAL_CACHE_TTL = 30
+
+
+@st.cache_data(ttl=LONG_CACHE_TTL)
+def fetch_maps():
+    """Get all available maps."""
+    return get_api_client().get_maps()
+
+
+@st.cache_data(ttl=LONG_CACHE_TTL)
+def fetch_map_index():
+    """
+    Get selectable map names and each name's position in that list.
     
-    # Title and header
-    st.title("🗺️ Tarkov Interactive Map Tracker")
-    st.markdown("---")
+    Returns:
+        Tuple of (map_names, {map_name: index})
+    """
+    map_names = [m['normalizedName'] for m in fetch_maps() if m.get('normalizedName')]
+    return map_names, {name: i for i, name in enumerate(map_names)}
+
+
+@st.cache_data(ttl=NORMAL_CACHE_TTL)
+def fetch_map_bundle(map_name: str):
+    """
+    Get everything the content area needs for a map in one cached call.
     
-    # Load configuration
-    config = load_config()
+    Returns:
+        Dict with 'quests', 'objectives' and 'map_data' for the map
+    """
+    api = get_api_client()
+    return {
+        'quests': api.get_quests(map_name),
+        'objectives': api.get_quest_objectives_with_locations(map_name),
+        'map_data': api.get_map_data(map_name),
+    }
+
+
+@st.cache_resource
+def get_renderer():
+    """Get cached map renderer instance."""
+    return MapRenderer()
+
+
+@st.cache_resource
+def get_screenshot_watcher():
+    """Get the app's single screenshot watcher (started by watch())."""
+    return ScreenshotWatcher(get_config_values().screenshot_path)
+
+
+def render_content(screenshot_path: str, map_level: int):
+    """Render the map and status columns."""
     
-    # Initialize session state
-    if 'current_position' not in st.session_state:
-        st.session_state.current_position = None
-    if 'current_map' not in st.session_state:
-        st.session_state.current_map = config['app']['default_map'] if config else 'customs'
-    if 'auto_refresh' not in st.session_state:
-        st.session_state.auto_refresh = False
-    if 'show_quests' not in st.session_state:
-        st.session_state.show_quests = True
-    
-    # Sidebar configuration
-    with st.sidebar:
-        st.header("⚙️ Configuration")
-        
-        # Path configuration
-        st.subheader("File Paths")
-        
-        default_screenshot_path = config['eft']['screenshot_path'] if config else ""
-        screenshot_path = st.text_input(
-            "Screenshot Directory",
-            value=default_screenshot_path,
-            help="Path to your EFT screenshots folder"
-        )
-        
-        default_log_path = config['eft']['log_path'] if config else ""
-        log_path = st.text_input(
-            "Log Directory",
-            value=default_log_path,
-            help="Path to EFT log files"
-        )
-        
-        st.markdown("---")
-        
-        # Map selection
-        st.subheader("Map Settings")
-        
-        api = get_api_client()
-        available_maps = api.get_maps()
-        map_names = [m['normalizedName'] for m in available_maps if m.get('normalizedName')]
-        
-        if map_names:
-            current_map_index = map_names.index(st.session_state.current_map) if st.session_state.current_map in map_names else 0
-            selected_map = st.selectbox(
-                "Select Map",
-                map_names,
-                index=current_map_index,
-                format_func=lambda x: x.title()
-            )
-            st.session_state.current_map = selected_map
-        else:
-            st.session_state.current_map = 'customs'
-            st.warning("Could not load maps from API. Using Customs as default.")
-        
-        # Map level for multi-level maps
-        map_level = st.selectbox(
-            "Map Level",
-            [1, 2, 3],
-            index=0,
-            help="Select floor level for multi-story maps"
-        )
-        
-        st.markdown("---")
-        
-        # Display options
-        st.subheader("Display Options")
-        st.session_state.show_quests = st.checkbox("Show Quest Markers", value=True)
-        
-        st.markdown("---")
-        
-        # Auto-refresh control
-        st.subheader("Live Tracking")
-        st.session_state.auto_refresh = st.checkbox(
-            "Auto-Refresh Position",
-            value=st.session_state.auto_refresh,
-            help="Automatically update position from latest screenshot"
-        )
-        
-        if st.session_state.auto_refresh:
-            refresh_interval = st.slider(
-                "Refresh Interval (seconds)",
-                min_value=1,
-                max_value=10,
-                value=config['app']['auto_refresh_interval'] if config else 2
-            )
+    # One cache lookup per rerun for all map-specific API data
+    bundle = fetch_map_bundle(st.session_state.current_map)
     
     # Main content area
     col1, col2 = st.columns([2, 1])
@@ -193,20 +184,22 @@ def main():
                 st.error("Invalid screenshot path. Please configure in sidebar.")
         
         # Auto-refresh position
-        if st.session_state.auto_refresh and screenshot_path:
-            position = get_latest_position(screenshot_path)
+        if st.session_state.auto_refresh and screenshot_path and os.path.isdir(os.path.expandvars(screenshot_path)):
+            # The watcher tracks new screenshots from filesystem events, so a
+            # refresh tick does not rescan the directory
+            watcher = get_screenshot_watcher()
+            watcher.watch(screenshot_path)
+            position = watcher.latest_position
             if position:
                 st.session_state.current_position = position
-            time.sleep(refresh_interval if 'refresh_interval' in locals() else 2)
-            st.rerun()
         
         # Render map
-        renderer = MapRenderer()
+        renderer = get_renderer()
         
         # Get quest data if enabled
         quests = None
         if st.session_state.show_quests:
-            quest_objectives = api.get_quest_objectives_with_locations(st.session_state.current_map)
+            quest_objectives = bundle['objectives']
             quests = quest_objectives
         
         # Create map HTML
@@ -248,7 +241,7 @@ def main():
         st.subheader(f"🎯 {st.session_state.current_map.title()} Quests")
         
         if st.session_state.show_quests:
-            quests = api.get_quests(st.session_state.current_map)
+            quests = bundle['quests']
             
             if quests:
                 st.write(f"**{len(quests)} quests** available on this map")
@@ -274,12 +267,109 @@ def main():
         
         # Map info
         st.subheader("ℹ️ Map Information")
-        map_data = api.get_map_data(st.session_state.current_map)
+        map_data = bundle['map_data']
         if map_data:
             st.write(f"**Name:** {map_data['name']}")
             st.write(f"**Raid Duration:** {map_data.get('raidDuration', 'Unknown')} min")
             if map_data.get('description'):
                 st.write(f"**Description:** {map_data['description']}")
+
+
+def main():
+    """Main application entry point."""
+    
+    # Title and header
+    st.title("🗺️ Tarkov Interactive Map Tracker")
+    st.markdown("---")
+    
+    # Load configuration
+    config = get_config_values()
+    
+    # Initialize session state
+    if 'current_position' not in st.session_state:
+        st.session_state.current_position = None
+    if 'current_map' not in st.session_state:
+        st.session_state.current_map = config.default_map
+    if 'auto_refresh' not in st.session_state:
+        st.session_state.auto_refresh = False
+    if 'show_quests' not in st.session_state:
+        st.session_state.show_quests = True
+    
+    # Sidebar configuration
+    with st.sidebar:
+        st.header("⚙️ Configuration")
+        
+        # Path configuration
+        st.subheader("File Paths")
+        
+        screenshot_path = st.text_input(
+            "Screenshot Directory",
+            value=config.screenshot_path,
+            help="Path to your EFT screenshots folder"
+        )
+        
+        log_path = st.text_input(
+            "Log Directory",
+            value=config.log_path,
+            help="Path to EFT log files"
+        )
+        
+        st.markdown("---")
+        
+        # Map selection
+        st.subheader("Map Settings")
+        
+        map_names, map_indexes = fetch_map_index()
+        
+        if map_names:
+            current_map_index = map_indexes.get(st.session_state.current_map, 0)
+            selected_map = st.selectbox(
+                "Select Map",
+                map_names,
+                index=current_map_index,
+                format_func=lambda x: x.title()
+            )
+            st.session_state.current_map = selected_map
+        else:
+            st.session_state.current_map = 'customs'
+            st.warning("Could not load maps from API. Using Customs as default.")
+        
+        # Map level for multi-level maps
+        map_level = st.selectbox(
+            "Map Level",
+            [1, 2, 3],
+            index=0,
+            help="Select floor level for multi-story maps"
+        )
+        
+        st.markdown("---")
+        
+        # Display options
+        st.subheader("Display Options")
+        st.session_state.show_quests = st.checkbox("Show Quest Markers", value=True)
+        
+        st.markdown("---")
+        
+        # Auto-refresh control
+        st.subheader("Live Tracking")
+        st.session_state.auto_refresh = st.checkbox(
+            "Auto-Refresh Position",
+            value=st.session_state.auto_refresh,
+            help="Automatically update position from latest screenshot"
+        )
+        
+        if st.session_state.auto_refresh:
+            refresh_interval = st.slider(
+                "Refresh Interval (seconds)",
+                min_value=1,
+                max_value=10,
+                value=config.auto_refresh_interval
+            )
+    
+    # Auto-refresh reruns only the content fragment on a timer, rather than
+    # sleeping in the script thread and rerunning the whole app
+    run_every = refresh_interval if st.session_state.auto_refresh else None
+    st.fragment(render_content, run_every=run_every)(screenshot_path, map_level)
     
     # Footer
     st.markdown("---")
@@ -0,0 +1,46 @@
+"""
+Shared pytest fixtures for the Tarkov Map Tracker test suite.
+
+Expensive objects (API client, map renderer) are created once per session
+and shared by every test that needs them.
+"""
+
+import json
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from map_renderer import MapRenderer
+from tarkov_api import TarkovAPI
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture(scope="session")
+def api_response():
+    """Recorded tarkov.dev GraphQL response (maps + tasks)."""
+    with open(FIXTURES_DIR / "tarkov_api.json", 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="session")
+def graphql_response(api_response):
+    """Fake HTTP response carrying the recorded GraphQL data."""
+    response = mock.Mock(status_code=200)
+    response.json.return_value = api_response
+    return response
+
+
+@pytest.fixture(scope="session")
+def api(graphql_response):
+    """TarkovAPI client whose HTTP session serves the recorded response."""
+    client = TarkovAPI()
+    with mock.patch.object(client._session, 'post', return_value=graphql_response):
+        yield client
+
+
+@pytest.fixture(scope="session")
+def renderer():
+    """Map renderer using the bundled map_cache."""
+    return MapRenderer(cache_dir=str(Path(__file__).parent / "map_cache"))
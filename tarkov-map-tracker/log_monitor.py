@@ -7,11 +7,11 @@ Ported from the-hideout/TarkovMonitor C# regex patterns to Python.
 
 import re
 import os
-import time
+import threading
 from pathlib import Path
-from typing import Optional, Callable, Dict, List
+from typing import Optional, Callable, Dict, List, Tuple
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler, FileModifiedEvent
+from watchdog.events import FileSystemEventHandler, FileModifiedEvent, FileCreatedEvent
 
 
 class TarkovLogMonitor:
@@ -32,6 +32,30 @@ class TarkovLogMonitor:
         'extract_started': re.compile(r"Extract\s+started", re.IGNORECASE),
     }
     
+    # Bytes requested per read when tailing the log
+    READ_CHUNK_SIZE = 65536
+    
+    # All patterns folded into one alternation so each line costs a single
+    # regex search; the named group that matched identifies the event type.
+    COMBINED_PATTERN = re.compile(
+        "|".join(f"(?P<{name}>{pattern.pattern})" for name, pattern in PATTERNS.items()),
+        re.IGNORECASE
+    )
+    
+    # Event ids follow PATTERNS order; the combined regex's group index for
+    # each event maps back to its id, and payload presence is looked up by id.
+    EVENT_TYPES = tuple(PATTERNS)
+    _GROUP_EVENTS = {index: event_id for event_id, index in enumerate(COMBINED_PATTERN.groupindex.values())}
+    _HAS_PAYLOAD = tuple(pattern.groups > 0 for pattern in PATTERNS.values())
+    
+    # Cheap keyword check that every event line must pass; most log lines
+    # match none of these and are rejected without running the full regex.
+    PREFILTER_PATTERN = re.compile(r"map|quest|raid|died|extract", re.IGNORECASE)
+    
+    # Log type at the end of an EFT log filename, e.g. 'application' in
+    # '2025.12.27_15-20-01_0.16.0 application_000.log'
+    LOG_TYPE_PATTERN = re.compile(r"([A-Za-z]+)(?:_\d+)?\.log$")
+    
     def __init__(self, log_path: str):
         """
         Initialize the log monitor.
@@ -52,46 +76,60 @@ class TarkovLogMonitor:
         }
         self.last_position = 0
         self.current_map = None
+        # Trailing partial line left over from the previous read
+        self._tail_buf = ''
+        # Set by the watchdog handler whenever the log changes on disk
+        self._wake = threading.Event()
+        # Path and inode of the log being tailed, and the log to switch to
+        # once the handler sees it rotated
+        self._log_file: Optional[str] = None
+        self._inode: Optional[int] = None
+        self._pending_file: Optional[str] = None
+        # Callbacks as a tuple of tuples indexed by event id, rebuilt on registration
+        self._frozen: Optional[Tuple[Tuple[Callable, ...], ...]] = None
+    
+    def _register(self, event_type: str, callback: Callable):
+        """Add a callback for an event type and invalidate the frozen callback table."""
+        self.callbacks[event_type].append(callback)
+        self._frozen = None
+        return self
+    
+    def _freeze_callbacks(self) -> Tuple[Tuple[Callable, ...], ...]:
+        """Snapshot the registered callbacks into a tuple indexed by event id."""
+        self._frozen = tuple(tuple(self.callbacks[event_type]) for event_type in self.EVENT_TYPES)
+        return self._frozen
         
     def on_map_loading(self, callback: Callable[[str], None]):
         """Register callback for map loading events."""
-        self.callbacks['map_loading'].append(callback)
-        return self
+        return self._register('map_loading', callback)
     
     def on_map_loaded(self, callback: Callable[[str], None]):
         """Register callback for map loaded events."""
-        self.callbacks['map_loaded'].append(callback)
-        return self
+        return self._register('map_loaded', callback)
     
     def on_quest_completed(self, callback: Callable[[str], None]):
         """Register callback for quest completion events."""
-        self.callbacks['quest_completed'].append(callback)
-        return self
+        return self._register('quest_completed', callback)
     
     def on_quest_started(self, callback: Callable[[str], None]):
         """Register callback for quest started events."""
-        self.callbacks['quest_started'].append(callback)
-        return self
+        return self._register('quest_started', callback)
     
     def on_raid_started(self, callback: Callable[[], None]):
         """Register callback for raid started events."""
-        self.callbacks['raid_started'].append(callback)
-        return self
+        return self._register('raid_started', callback)
     
     def on_raid_ended(self, callback: Callable[[], None]):
         """Register callback for raid ended events."""
-        self.callbacks['raid_ended'].append(callback)
-        return self
+        return self._register('raid_ended', callback)
     
     def on_player_died(self, callback: Callable[[], None]):
         """Register callback for player death events."""
-        self.callbacks['player_died'].append(callback)
-        return self
+        return self._register('player_died', callback)
     
     def on_extract_started(self, callback: Callable[[], None]):
         """Register callback for extract started events."""
-        self.callbacks['extract_started'].append(callback)
-        return self
+        return self._register('extract_started', callback)
     
     def _get_log_file(self) -> Optional[str]:
         """Find the most recent EFT log file."""
@@ -108,37 +146,89 @@ class TarkovLogMonitor:
             print(f"Error finding log file: {e}")
             return None
     
-    def _process_line(self, line: str):
-        """Process a single log line and trigger callbacks if patterns match."""
+    def _process_line(self, line: str) -> Optional[Tuple[str, Optional[str]]]:
+        """
+        Process a single log line and trigger callbacks if patterns match.
+        
+        Args:
+            line: Raw log line
+            
+        Returns:
+            Tuple of (event_type, data) for a matching line, or None
+        """
         line = line.strip()
-        if not line:
-            return
+        if not line or not self.PREFILTER_PATTERN.search(line):
+            return None
         
-        # Check each pattern
-        for event_type, pattern in self.PATTERNS.items():
-            match = pattern.search(line)
-            if match:
-                # Extract captured group if exists (e.g., map name, quest ID)
-                data = match.group(1) if match.groups() else None
-                
-                # Special handling for map events
-                if event_type == 'map_loaded' and data:
-                    self.current_map = data.lower()
-                
-                # Trigger callbacks
-                for callback in self.callbacks[event_type]:
-                    try:
-                        if data:
-                            callback(data)
-                        else:
-                            callback()
-                    except Exception as e:
-                        print(f"Error in callback for {event_type}: {e}")
+        match = self.COMBINED_PATTERN.search(line)
+        if not match:
+            return None
+        
+        event_id = self._GROUP_EVENTS[match.lastindex]
+        
+        # Extract captured group if exists (e.g., map name, quest ID).
+        # The payload group directly follows the event's named group.
+        data = match.group(match.lastindex + 1) if self._HAS_PAYLOAD[event_id] else None
+        
+        # Special handling for map events
+        if data and match.lastgroup == 'map_loaded':
+            self.current_map = data.lower()
+        
+        # Trigger callbacks (argument tuple is built once, not per callback)
+        frozen = self._frozen if self._frozen is not None else self._freeze_callbacks()
+        args = (data,) if data else ()
+        for callback in frozen[event_id]:
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Error in callback for {match.lastgroup}: {e}")
+        
+        return match.lastgroup, data
+    
+    def _open_log(self, filepath: str):
+        """Open a log file for tailing and remember its identity."""
+        f = open(filepath, 'r', encoding='utf-8', errors='ignore', buffering=self.READ_CHUNK_SIZE)
+        self._log_file = os.path.abspath(filepath)
+        self._inode = os.fstat(f.fileno()).st_ino
+        return f
+    
+    def _check_rotation(self, filepath: str, created: bool):
+        """
+        Called from the watchdog thread when a log file changes.
+        
+        Queues a switch when a new log of the same type as the tailed one
+        appears next to it, or when the tailed path now refers to a different
+        file. EFT writes several logs side by side (application, backend,
+        errors...), so other new logs are ignored.
+        """
+        filepath = os.path.abspath(filepath)
+        if filepath == self._log_file:
+            try:
+                if os.stat(filepath).st_ino != self._inode:
+                    self._pending_file = filepath
+            except OSError:
+                return
+        elif (created and not os.path.isfile(self.log_path)
+                and self._log_file and self._log_type(filepath) == self._log_type(self._log_file)):
+            self._pending_file = filepath
+        self._wake.set()
+    
+    @classmethod
+    def _log_type(cls, filepath: str) -> str:
+        """
+        Get the log type from a log filename.
+        
+        e.g. '2025.12.27_15-20-01_0.16.0 application_000.log' -> 'application'
+        """
+        name = os.path.basename(filepath)
+        match = cls.LOG_TYPE_PATTERN.search(name)
+        return match.group(1).lower() if match else name.lower()
     
     def _tail_file(self, filepath: str):
         """Continuously read new lines from log file (tail -f behavior)."""
         try:
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+            f = self._open_log(filepath)
+            try:
                 # Seek to last position or end of file
                 if self.last_position > 0:
                     f.seek(self.last_position)
@@ -146,12 +236,33 @@ class TarkovLogMonitor:
                     f.seek(0, 2)  # Seek to end
                 
                 while True:
-                    line = f.readline()
-                    if line:
-                        self._process_line(line)
+                    data = f.read(self.READ_CHUNK_SIZE)
+                    if data:
+                        text = self._tail_buf + data
+                        # Keep the incomplete last line until the rest arrives
+                        lines = text.split('\n')
+                        self._tail_buf = lines.pop()
+                        # One prefilter scan over the whole block: a block with
+                        # no event keyword cannot contain an event line
+                        if self.PREFILTER_PATTERN.search(text):
+                            for line in lines:
+                                self._process_line(line)
                         self.last_position = f.tell()
+                    elif self._pending_file:
+                        # Old log is drained; continue from the start of the new one
+                        self._process_line(self._tail_buf)
+                        self._tail_buf = ''
+                        f.close()
+                        print(f"Log rotated, monitoring: {self._pending_file}")
+                        f = self._open_log(self._pending_file)
+                        self._pending_file = None
+                        self.last_position = 0
                     else:
-                        time.sleep(0.1)  # Wait for new data
+                        # Sleep until watchdog reports a write (timeout is a safety net)
+                        self._wake.wait(timeout=1.0)
+                        self._wake.clear()
+            finally:
+                f.close()
         except Exception as e:
             print(f"Error reading log file: {e}")
     
@@ -165,7 +276,16 @@ class TarkovLogMonitor:
             raise FileNotFoundError(f"No log file found in {self.log_path}")
         
         print(f"Monitoring log file: {log_file}")
-        self._tail_file(log_file)
+        self._freeze_callbacks()
+        
+        observer = Observer()
+        observer.schedule(LogFileHandler(self), os.path.dirname(os.path.abspath(log_file)))
+        observer.start()
+        try:
+            self._tail_file(log_file)
+        finally:
+            observer.stop()
+            observer.join()
     
     def get_current_map(self) -> Optional[str]:
         """Get the currently loaded map name."""
@@ -181,8 +301,13 @@ class LogFileHandler(FileSystemEventHandler):
     def on_modified(self, event: FileModifiedEvent):
         """Handle log file modification."""
         if not event.is_directory and event.src_path.endswith('.log'):
-            # File was modified, tail will handle reading new lines
-            pass
+            # Wake the tail loop so it reads the new lines
+            self.monitor._check_rotation(event.src_path, created=False)
+    
+    def on_created(self, event: FileCreatedEvent):
+        """Handle a new log file (EFT starts a new log per session)."""
+        if not event.is_directory and event.src_path.endswith('.log'):
+            self.monitor._check_rotation(event.src_path, created=True)
 
 
 def create_monitor(log_path: str) -> TarkovLogMonitor:
@@ -4,14 +4,135 @@ Renders interactive Tarkov maps using SVG maps and configuration from tarkov.dev
 """
 
 import os
+import html
 import json
 import requests
-import math
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 import xml.etree.ElementTree as ET
 
 
+# 2x3 affine matrix ((a, b, c), (d, e, f)) mapping game (x, y) to SVG coordinates
+Affine = Tuple[Tuple[float, float, float], Tuple[float, float, float]]
+
+
+# Leaflet setup part of the map page: container, map, CRS transformation and
+# SVG overlay. Filled in once per (map, size) by MapRenderer._get_base_html.
+_MAP_HEAD_TEMPLATE = """
+        <div id="map-host" style="width:{width}px; height:{height}px; background:#0f1112; border:1px solid #2d3336; border-radius:8px; overflow:hidden;">
+            <div id="leaflet-map" style="width:100%; height:100%;"></div>
+        </div>
+        
+        <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css" />
+        <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
+        
+        <script>
+            (function() {{
+                // Initialize Map
+                const map = L.map('leaflet-map', {{
+                    crs: L.CRS.Simple,
+                    attributionControl: false,
+                    zoomControl: true,
+                    minZoom: {min_zoom},
+                    maxZoom: {max_zoom}
+                }});
+
+                // Set up Transformation (a, b, c, d)
+                // L.Transformation transforms coordinates: x' = a*x + b, y' = c*y + d
+                const t = {transform};
+                L.CRS.Simple.transformation = new L.Transformation(t[0], t[1], t[2], t[3]);
+
+                // SVG Overlay
+                const bounds = {bounds};
+                
+                // Calculate correct min/max to support various bounds formats
+                const x1 = bounds[0][0];
+                const y1 = bounds[0][1];
+                const x2 = bounds[1][0];
+                const y2 = bounds[1][1];
+                
+                const minX = Math.min(x1, x2);
+                const maxX = Math.max(x1, x2);
+                const minY = Math.min(y1, y2);
+                const maxY = Math.max(y1, y2);
+
+                // Leaflet Simple CRS uses [y, x] order
+                const southWest = L.latLng(minY, minX);
+                const northEast = L.latLng(maxY, maxX);
+                const mapBounds = L.latLngBounds(southWest, northEast);
+
+                const svgLayer = L.imageOverlay('{svg_url}', mapBounds);
+                svgLayer.addTo(map);
+
+                // Fit map to bounds
+                map.fitBounds(mapBounds);
+
+"""
+
+
+# Marker and styling part of the map page, identical for every map. The
+# player and questMarkers declarations are inserted just before it.
+_MARKERS_SCRIPT = """                // Player marker
+                if (player) {
+                    const playerIcon = L.divIcon({
+                        className: 'player-marker',
+                        html: `<div class="player-arrow" style="transform: rotate(${player.rotation}deg);">▲</div>`,
+                        iconSize: [30, 30],
+                        iconAnchor: [15, 15]
+                    });
+                    L.marker([player.lat, player.lng], { icon: playerIcon })
+                        .addTo(map)
+                        .bindPopup('<b>YOU</b>');
+                }
+
+                // Quest markers: [lat, lng, popupHtml]
+                // Drawn as vector circles on one shared canvas instead of a DOM
+                // node per marker, which keeps pan/zoom fast on large quest lists.
+                const questStyle = {
+                    renderer: L.canvas({ padding: 0.5 }),
+                    radius: 7,
+                    color: 'white',
+                    weight: 2,
+                    fillColor: '#0088ff',
+                    fillOpacity: 1
+                };
+                questMarkers.forEach(q => {
+                    L.circleMarker([q[0], q[1]], questStyle)
+                        .addTo(map)
+                        .bindPopup(q[2]);
+                });
+
+                // Coordinate Logger for debugging
+                map.on('click', function(e) {
+                    console.log("Clicked at: " + e.latlng.lng.toFixed(2) + ", " + e.latlng.lat.toFixed(2));
+                });
+            })();
+        </script>
+        
+        <style>
+            .player-marker {
+                display: flex;
+                align-items: center;
+                justify-content: center;
+                pointer-events: auto !important;
+            }
+            .player-arrow {
+                color: #ff4141;
+                font-size: 24px;
+                text-shadow: 0 0 3px black;
+            }
+            .leaflet-container {
+                background: #0f1112 !important;
+            }
+            .leaflet-popup-content-wrapper, .leaflet-popup-tip {
+                background: #1a1c1d;
+                color: #e3e3e3;
+                border: 1px solid #2d3336;
+            }
+        </style>
+        """
+
+
 class MapRenderer:
     """Renders interactive maps using SVG files and data from tarkov.dev."""
     
@@ -29,6 +150,17 @@ class MapRenderer:
         self.cache_dir = Path(cache_dir or "map_cache")
         self.cache_dir.mkdir(exist_ok=True)
         self.maps_config = self._load_maps_config()
+        # normalizedName -> resolved map config. Reversed so the first entry
+        # with a given name wins, as in a scan.
+        self._map_configs: Dict[str, Optional[Dict[str, Any]]] = {
+            m.get('normalizedName'): self._select_projection(m) for m in reversed(self.maps_config)
+        }
+        # Per-map Leaflet settings, resolved once and reused across renders
+        self._base_layers: Dict[str, Optional[Dict[str, Any]]] = {}
+        # Static HTML per (map_name, width, height) up to the marker data
+        self._base_html: Dict[Tuple[str, int, int], str] = {}
+        # Per-map affine matrix used by coordinate conversion, computed on first use
+        self._coord_lut: Dict[str, Affine] = {}
     
     def _load_maps_config(self) -> List[Dict[str, Any]]:
         """Load maps configuration from GitHub or cache."""
@@ -46,9 +178,9 @@ class MapRenderer:
         try:
             response = requests.get(self.MAPS_JSON_URL, timeout=10)
             if response.status_code == 200:
-                config = response.json()
-                with open(local_path, 'w', encoding='utf-8') as f:
-                    json.dump(config, f)
+                # Cache the raw bytes as served; no need to re-serialize
+                config = json.loads(response.content)
+                local_path.write_bytes(response.content)
                 return config
         except Exception as e:
             print(f"Error loading maps config: {e}")
@@ -57,15 +189,18 @@ class MapRenderer:
 
     def _get_map_config(self, normalized_name: str) -> Optional[Dict[str, Any]]:
         """Get configuration for a specific map."""
-        for map_entry in self.maps_config:
-            if map_entry.get('normalizedName') == normalized_name:
-                # Use the 'interactive' projection map if available
-                for m in map_entry.get('maps', []):
-                    if m.get('projection') == 'interactive':
-                        return m
-                # Fallback to first map
-                if map_entry.get('maps'):
-                    return map_entry['maps'][0]
+        return self._map_configs.get(normalized_name)
+
+    @staticmethod
+    def _select_projection(map_entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Pick the map config to render from a maps.json entry."""
+        # Use the 'interactive' projection map if available
+        for m in map_entry.get('maps', []):
+            if m.get('projection') == 'interactive':
+                return m
+        # Fallback to first map
+        if map_entry.get('maps'):
+            return map_entry['maps'][0]
         return None
 
     def _get_svg_content(self, map_config: Dict[str, Any]) -> Optional[str]:
@@ -98,6 +233,45 @@ class MapRenderer:
             
         return None
 
+    @staticmethod
+    def _compute_affine(map_config: Dict[str, Any]) -> Affine:
+        """
+        Compute the 2x3 affine matrix that converts game coordinates for a map.
+        
+        Returns:
+            Matrix rows ((a, b, c), (d, e, f)) so that
+            svg_x = a*x + b*y + c and svg_y = d*x + e*y + f
+        """
+        bounds = map_config.get('bounds')
+        if not bounds or len(bounds) < 2:
+            # Fallback to rough estimation: (x + 500, 500 - y)
+            return ((1.0, 0.0, 500.0), (0.0, -1.0, 500.0))
+            
+        # Bounds format: [[minX, maxY], [maxX, minY]]
+        (x1, y1), (x2, y2) = bounds[0], bounds[1]
+        min_x, max_x = min(x1, x2), max(x1, x2)
+        min_y, max_y = min(y1, y2), max(y1, y2)
+        
+        # Scale to map dimensions
+        # This is where we'd need the SVG viewBox actually
+        # But for now let's use the percentile within bounds
+        range_x = max_x - min_x if max_x != min_x else 1000
+        range_y = max_y - min_y if max_y != min_y else 1000
+        
+        # Percentage within bounds, with Y inverted for SVG
+        scale_x = 100 / range_x
+        scale_y = 100 / range_y
+        return ((scale_x, 0.0, -min_x * scale_x), (0.0, -scale_y, max_y * scale_y))
+
+    def _get_affine(self, map_config: Dict[str, Any]) -> Affine:
+        """Get the affine matrix for a map config, computing it on first use."""
+        key = map_config.get('key', '')
+        try:
+            return self._coord_lut[key]
+        except KeyError:
+            affine = self._coord_lut[key] = self._compute_affine(map_config)
+            return affine
+
     def _calculate_svg_coords(
         self, 
         game_x: float, 
@@ -107,37 +281,67 @@ class MapRenderer:
         height: float
     ) -> Tuple[float, float]:
         """
-        Convert game coordinates to SVG coordinates based on bounds and rotation.
+        Convert game coordinates to SVG coordinates based on bounds.
         """
-        bounds = map_config.get('bounds')
-        rotation = map_config.get('coordinateRotation', 0)
+        (a, b, c), (d, e, f) = self._get_affine(map_config)
+        # Returns as percentage for flexible SVG usage
+        return a * game_x + b * game_y + c, d * game_x + e * game_y + f
+
+    def _get_base_layer(self, map_name: str) -> Optional[Dict[str, Any]]:
+        """Get the invariant Leaflet settings (SVG overlay, bounds, transform) for a map."""
+        if map_name in self._base_layers:
+            return self._base_layers[map_name]
         
-        if not bounds or len(bounds) < 2:
-            # Fallback to rough estimation
-            return (game_x + 500), (500 - game_y)
+        map_config = self._get_map_config(map_name)
+        if not map_config:
+            self._base_layers[map_name] = None
+            return None
             
-        # Bounds format: [[minX, maxY], [maxX, minY]]
-        min_x = bounds[1][0] if bounds[0][0] > bounds[1][0] else bounds[0][0]
-        max_x = bounds[0][0] if bounds[0][0] > bounds[1][0] else bounds[1][0]
-        min_y = bounds[1][1] if bounds[0][1] > bounds[1][1] else bounds[0][1]
-        max_y = bounds[0][1] if bounds[0][1] > bounds[1][1] else bounds[1][1]
+        # Prioritize the tarkov-dev-svg-maps repo URL
+        map_key = map_config.get('key', '')
+        # Special case for streets because the key is 'streets-of-tarkov' but filename is 'StreetsOfTarkov.svg'
+        # We can use our MAP_FILES mapping logic or just construct it
+        svg_filename = f"{map_key.replace('-', ' ').title().replace(' ', '')}.svg"
+        if map_key == 'streets-of-tarkov':
+            svg_filename = "StreetsOfTarkov.svg"
         
-        # Apply rotation to game coordinates if needed
-        # (This is a simplified version, real rotation might be more complex)
-        rad = math.radians(rotation)
-        rot_x = game_x * math.cos(rad) - game_y * math.sin(rad)
-        rot_y = game_x * math.sin(rad) + game_y * math.cos(rad)
+        base_layer = {
+            'svg_url': f"{self.SVG_BASE_URL}/{svg_filename}",
+            # bounds are [[minX, maxY], [maxX, minY]] or similar
+            # For Leaflet L.ImageOverlay, we need [[minY, minX], [maxY, maxX]] usually, 
+            # but tarkov.dev uses CRS.Simple with a custom transformation.
+            'bounds': map_config.get('bounds', [[0, 0], [1000, 1000]]),
+            # transform is [a, b, c, d] for L.Transformation(a, b, c, d)
+            'transform': map_config.get('transform', [1, 0, 1, 0]),
+            'min_zoom': map_config.get('minZoom', 1),
+            'max_zoom': map_config.get('maxZoom', 5),
+        }
+        self._base_layers[map_name] = base_layer
+        return base_layer
+
+    def _get_base_html(self, map_name: str, width: int, height: int) -> str:
+        """
+        Get the static HTML for a map up to the marker data, building it on first use.
         
-        # Scale to map dimensions
-        # This is where we'd need the SVG viewBox actually
-        # But for now let's use the percentile within bounds
-        range_x = max_x - min_x if max_x != min_x else 1000
-        range_y = max_y - min_y if max_y != min_y else 1000
+        Covers the container, Leaflet setup, transformation and SVG overlay.
+        """
+        cache_key = (map_name, width, height)
+        if cache_key in self._base_html:
+            return self._base_html[cache_key]
         
-        perc_x = (game_x - min_x) / range_x
-        perc_y = (max_y - game_y) / range_y # Y is usually inverted in SVG
+        base_layer = self._get_base_layer(map_name)
         
-        return perc_x * 100, perc_y * 100 # Returns as percentage for flexible SVG usage
+        head = _MAP_HEAD_TEMPLATE.format(
+            width=width,
+            height=height,
+            min_zoom=base_layer['min_zoom'],
+            max_zoom=base_layer['max_zoom'],
+            transform=base_layer['transform'],
+            bounds=base_layer['bounds'],
+            svg_url=base_layer['svg_url'],
+        )
+        self._base_html[cache_key] = head
+        return head
 
     def render_map(
         self,
@@ -149,150 +353,45 @@ class MapRenderer:
         height: int = 600
     ) -> str:
         """Render map as HTML using Leaflet.js."""
-        map_config = self._get_map_config(map_name)
+        base_layer = self._get_base_layer(map_name)
         
-        if not map_config:
+        if not base_layer:
             return f"<div style='color:red; background:#1a1a1a; padding:20px;'>Map config not found for {map_name}</div>"
-            
-        # Prioritize the tarkov-dev-svg-maps repo URL
-        map_key = map_config.get('key', '')
-        # Special case for streets because the key is 'streets-of-tarkov' but filename is 'StreetsOfTarkov.svg'
-        # We can use our MAP_FILES mapping logic or just construct it
-        svg_filename = f"{map_key.replace('-', ' ').title().replace(' ', '')}.svg"
-        if map_key == 'streets-of-tarkov':
-            svg_filename = "StreetsOfTarkov.svg"
-            
-        svg_url = f"{self.SVG_BASE_URL}/{svg_filename}"
-        
-        # Leaflet Configuration
-        bounds = map_config.get('bounds', [[0, 0], [1000, 1000]])
-        # bounds are [[minX, maxY], [maxX, minY]] or similar
-        # For Leaflet L.ImageOverlay, we need [[minY, minX], [maxY, maxX]] usually, 
-        # but tarkov.dev uses CRS.Simple with a custom transformation.
-        
-        transform = map_config.get('transform', [1, 0, 1, 0])
-        # transform is [a, b, c, d] for L.Transformation(a, b, c, d)
         
         # Prepare markers for JS
-        js_markers = []
+        player_marker = None
         if player_position:
-            js_markers.append({
+            player_marker = {
                 'lat': player_position['y'],
                 'lng': player_position['x'],
-                'title': 'YOU',
-                'color': '#ff4141',
                 'rotation': player_position.get('rotation', 0),
-                'type': 'player'
-            })
+            }
             
+        # Quest markers all share one style, so only [lat, lng, popup] is sent
+        # per marker and the icon is built once on the JS side.
+        quest_markers = []
         if quests:
-            for i, quest in enumerate(quests):
-                if 'x' in quest and 'y' in quest:
-                    js_markers.append({
-                        'lat': quest['y'],
-                        'lng': quest['x'],
-                        'title': quest.get('quest_name', f'Quest {i+1}'),
-                        'color': '#0088ff',
-                        'type': 'quest'
-                    })
-
-        # Leaflet implementation
-        html = f"""
-        <div id="map-host" style="width:{width}px; height:{height}px; background:#0f1112; border:1px solid #2d3336; border-radius:8px; overflow:hidden;">
-            <div id="leaflet-map" style="width:100%; height:100%;"></div>
-        </div>
-        
-        <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css" />
-        <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
-        
-        <script>
-            (function() {{
-                // Initialize Map
-                const map = L.map('leaflet-map', {{
-                    crs: L.CRS.Simple,
-                    attributionControl: false,
-                    zoomControl: true,
-                    minZoom: {map_config.get('minZoom', 1)},
-                    maxZoom: {map_config.get('maxZoom', 5)}
-                }});
+            # Coordinates pass through untouched (Leaflet's CRS transform projects
+            # them), so the quest markers are built in a single comprehension.
+            # Objectives from TarkovAPI carry ready-made popup HTML.
+            quest_markers = [
+                [
+                    quest['y'],
+                    quest['x'],
+                    quest['popup_html'] if 'popup_html' in quest
+                    else f"<b>{html.escape(quest.get('quest_name') or f'Quest {i+1}')}</b>"
+                ]
+                for i, quest in enumerate(quests)
+                if 'x' in quest and 'y' in quest
+            ]
 
-                // Set up Transformation (a, b, c, d)
-                // L.Transformation transforms coordinates: x' = a*x + b, y' = c*y + d
-                const t = {transform};
-                L.CRS.Simple.transformation = new L.Transformation(t[0], t[1], t[2], t[3]);
-
-                // SVG Overlay
-                const bounds = {bounds};
-                
-                // Calculate correct min/max to support various bounds formats
-                const x1 = bounds[0][0];
-                const y1 = bounds[0][1];
-                const x2 = bounds[1][0];
-                const y2 = bounds[1][1];
-                
-                const minX = Math.min(x1, x2);
-                const maxX = Math.max(x1, x2);
-                const minY = Math.min(y1, y2);
-                const maxY = Math.max(y1, y2);
-
-                // Leaflet Simple CRS uses [y, x] order
-                const southWest = L.latLng(minY, minX);
-                const northEast = L.latLng(maxY, maxX);
-                const mapBounds = L.latLngBounds(southWest, northEast);
-
-                const svgLayer = L.imageOverlay('{svg_url}', mapBounds);
-                svgLayer.addTo(map);
-
-                // Fit map to bounds
-                map.fitBounds(mapBounds);
-
-                // Markers
-                const markers = {json.dumps(js_markers)};
-                markers.forEach(m => {{
-                    let icon;
-                    if (m.type === 'player') {{
-                        icon = L.divIcon({{
-                            className: 'player-marker',
-                            html: `<div style="transform: rotate(${{m.rotation}}deg); color: ${{m.color}}; font-size: 24px; text-shadow: 0 0 3px black;">▲</div>`,
-                            iconSize: [30, 30],
-                            iconAnchor: [15, 15]
-                        }});
-                    }} else {{
-                        icon = L.divIcon({{
-                            className: 'quest-marker',
-                            html: `<div style="background: ${{m.color}}; border: 2px solid white; border-radius: 50%; width: 14px; height: 14px; box-shadow: 0 0 5px black;"></div>`,
-                            iconSize: [20, 20],
-                            iconAnchor: [10, 10]
-                        }});
-                    }}
-
-                    L.marker([m.lat, m.lng], {{ icon: icon }})
-                        .addTo(map)
-                        .bindPopup(`<b>${{m.title}}</b>`);
-                }});
-
-                // Coordinate Logger for debugging
-                map.on('click', function(e) {{
-                    console.log("Clicked at: " + e.latlng.lng.toFixed(2) + ", " + e.latlng.lat.toFixed(2));
-                }});
-            }})();
-        </script>
-        
-        <style>
-            .player-marker, .quest-marker {{
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                pointer-events: auto !important;
-            }}
-            .leaflet-container {{
-                background: #0f1112 !important;
-            }}
-            .leaflet-popup-content-wrapper, .leaflet-popup-tip {{
-                background: #1a1c1d;
-                color: #e3e3e3;
-                border: 1px solid #2d3336;
-            }}
-        </style>
-        """
-        return html
+        # Only the marker data changes between renders. The quest list is
+        # embedded as a JSON string for JSON.parse, which browsers parse faster
+        # than the equivalent object literal; "</" is escaped so popup HTML
+        # can never close the script tag.
+        quest_json = json.dumps(json.dumps(quest_markers)).replace('</', '<\\/')
+        marker_data = (
+            f"                const player = {json.dumps(player_marker)};\n"
+            f"                const questMarkers = JSON.parse({quest_json});\n\n"
+        )
+        return self._get_base_html(map_name, width, height) + marker_data + _MARKERS_SCRIPT
@@ -8,11 +8,14 @@ Example: 2025-12-27[15:20]_1234.56,789.01,2.34_45deg.png
 """
 
 import re
-import glob
 import os
+import queue
+import threading
 from pathlib import Path
 from typing import Optional, Dict
 from datetime import datetime
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler, FileCreatedEvent, FileMovedEvent
 
 
 class ScreenshotParser:
@@ -41,32 +44,52 @@ class ScreenshotParser:
         Returns:
             Path to the latest screenshot, or None if no screenshots found
         """
+        latest = self._get_latest_entry()
+        return latest.path if latest else None
+    
+    def _get_latest_entry(self) -> Optional[os.DirEntry]:
+        """Find the directory entry of the most recently modified screenshot."""
         try:
-            screenshots = glob.glob(os.path.join(self.screenshot_path, "*.png"))
-            if not screenshots:
-                return None
-            return max(screenshots, key=os.path.getmtime)
+            # DirEntry caches its stat result, so each file is stat'ed once
+            with os.scandir(self.screenshot_path) as entries:
+                return max(
+                    (e for e in entries if e.name.lower().endswith('.png') and e.is_file()),
+                    key=lambda e: e.stat().st_mtime,
+                    default=None
+                )
+        except FileNotFoundError:
+            return None
         except (OSError, ValueError) as e:
             print(f"Error finding screenshots: {e}")
             return None
     
-    def parse_filename(self, filename: str) -> Optional[Dict[str, float]]:
+    def parse_filename(self, filename: str, *, mtime: Optional[float] = None) -> Optional[Dict[str, float]]:
         """
         Parse position data from a screenshot filename.
         
         Args:
             filename: Full path or just filename of the screenshot
+            mtime: Modification time if the caller already has it (saves a stat)
             
         Returns:
             Dict with keys: x, y, z, rotation, timestamp
             Returns None if filename doesn't match expected pattern
         """
         basename = Path(filename).name
+        # Cheap suffix check rejects ordinary screenshots before the regex runs
+        if not basename.lower().endswith('deg.png'):
+            return None
         match = self.POSITION_PATTERN.search(basename)
         
         if not match:
             return None
         
+        if mtime is None:
+            try:
+                mtime = os.stat(filename).st_mtime
+            except OSError:
+                mtime = None
+        
         try:
             position_data = {
                 'x': float(match.group(1)),
@@ -74,7 +97,7 @@ class ScreenshotParser:
                 'z': float(match.group(3)),
                 'rotation': int(match.group(4)),
                 'filename': basename,
-                'timestamp': os.path.getmtime(filename) if os.path.exists(filename) else None
+                'timestamp': mtime
             }
             return position_data
         except (ValueError, IndexError) as e:
@@ -90,30 +113,62 @@ class ScreenshotParser:
         Returns:
             Dict with position data, or None if no valid screenshot found
         """
-        latest = self.get_latest_screenshot()
+        latest = self._get_latest_entry()
         if not latest:
             return None
-        return self.parse_filename(latest)
+        return self.parse_filename(latest.path, mtime=latest.stat().st_mtime)
     
     def watch_for_updates(self, callback, interval: float = 1.0):
         """
         Continuously monitor for new screenshots and call callback with position data.
         
+        Uses filesystem events when available and falls back to polling.
+        Either way the callback runs on the calling thread, in screenshot order.
+        
         Args:
             callback: Function to call with position data when new screenshot detected
             interval: How often to check for updates (seconds)
         """
+        # The observer thread only queues positions; this thread reports them
+        updates: "queue.Queue[Dict[str, float]]" = queue.Queue()
+        # Report the current position straight away, as polling does. It is
+        # queued before the observer starts, so it comes before any newer one.
+        current = self.get_latest_position()
+        if current:
+            updates.put(current)
+        
+        watcher = ScreenshotWatcher(self.screenshot_path, callback=updates.put)
+        try:
+            watcher.start()
+        except OSError as e:
+            print(f"Filesystem events unavailable, polling instead: {e}")
+            self._poll_for_updates(callback, interval)
+            return
+        
+        try:
+            while True:
+                try:
+                    position = updates.get(timeout=interval)
+                except queue.Empty:
+                    continue
+                callback(position)
+        finally:
+            watcher.stop()
+    
+    def _poll_for_updates(self, callback, interval: float):
+        """Polling fallback for watch_for_updates."""
         import time
         last_file = None
         last_mtime = 0
         
         while True:
             try:
-                latest = self.get_latest_screenshot()
+                entry = self._get_latest_entry()
+                latest = entry.path if entry else None
                 if latest and latest != last_file:
-                    mtime = os.path.getmtime(latest)
+                    mtime = entry.stat().st_mtime
                     if mtime > last_mtime:
-                        position = self.parse_filename(latest)
+                        position = self.parse_filename(latest, mtime=mtime)
                         if position:
                             callback(position)
                         last_file = latest
@@ -124,6 +179,79 @@ class ScreenshotParser:
             time.sleep(interval)
 
 
+class ScreenshotWatcher(FileSystemEventHandler):
+    """
+    Watchdog handler that tracks the newest screenshot in a directory.
+    
+    The directory is scanned once on start; after that the latest position
+    is updated from filesystem events, so reading it costs no I/O.
+    """
+    
+    def __init__(self, screenshot_path: str, callback=None):
+        """
+        Initialize the watcher.
+        
+        Args:
+            screenshot_path: Directory path containing EFT screenshots
+            callback: Optional function called with position data for each new screenshot
+        """
+        self.parser = ScreenshotParser(screenshot_path)
+        self.callback = callback
+        self.latest_position: Optional[Dict[str, float]] = None
+        self._observer: Optional[Observer] = None
+        self._lock = threading.Lock()
+    
+    def _update(self, path: str):
+        """Parse a new screenshot and make it the latest position."""
+        if path.lower().endswith('.png'):
+            self.latest_position = self.parser.parse_filename(path)
+            if self.latest_position and self.callback:
+                self.callback(self.latest_position)
+    
+    def on_created(self, event: FileCreatedEvent):
+        """Handle a new screenshot being written."""
+        if not event.is_directory:
+            self._update(event.src_path)
+    
+    def on_moved(self, event: FileMovedEvent):
+        """Handle a screenshot being renamed into place."""
+        if not event.is_directory:
+            self._update(event.dest_path)
+    
+    def start(self):
+        """Scan for the current latest screenshot and start watching for new ones."""
+        self.latest_position = self.parser.get_latest_position()
+        observer = Observer()
+        observer.schedule(self, self.parser.screenshot_path)
+        observer.start()
+        self._observer = observer
+    
+    def watch(self, screenshot_path: str):
+        """
+        Make sure the watcher is running on a directory.
+        
+        Keeps the current observer if it already watches that directory;
+        otherwise stops it and starts watching the new one, so changing the
+        path never leaves an orphaned observer thread behind.
+        
+        Args:
+            screenshot_path: Directory path containing EFT screenshots
+        """
+        with self._lock:
+            if self._observer and os.path.expandvars(screenshot_path) == self.parser.screenshot_path:
+                return
+            self.stop()
+            self.parser = ScreenshotParser(screenshot_path)
+            self.start()
+    
+    def stop(self):
+        """Stop watching the screenshot directory."""
+        if self._observer:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+
+
 def get_latest_position(screenshot_path: str) -> Optional[Dict[str, float]]:
     """
     Convenience function to get latest position without creating a parser instance.
@@ -5,9 +5,18 @@ GraphQL client for the-hideout/tarkov-api (tarkov.dev API)
 Fetches quest data, map information, and other game data.
 """
 
+import html
+import json
+import sqlite3
+import threading
 import time
+import zlib
 import requests
-from typing import Dict, List, Optional, Any
+from contextlib import closing
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Any
 from functools import lru_cache
 
 
@@ -16,27 +25,157 @@ class TarkovAPI:
     
     API_URL = "https://api.tarkov.dev/graphql"
     
-    def __init__(self, cache_ttl: int = 300):
+    # Top-level query fields, shared by the single-field queries and the
+    # batched warm-up query
+    MAPS_FIELDS = """
+            maps {
+                id
+                name
+                normalizedName
+                wiki
+                description
+                enemies
+                raidDuration
+            }
+    """
+    
+    TASKS_FIELDS = """
+            tasks {
+                id
+                name
+                normalizedName
+                trader {
+                    name
+                }
+                map {
+                    name
+                    normalizedName
+                }
+                experience
+                objectives {
+                    id
+                    type
+                    description
+                    optional
+                    maps {
+                        name
+                        normalizedName
+                    }
+                    ...on TaskObjectiveBasic {
+                        zones {
+                            map { normalizedName }
+                            position { x y z }
+                        }
+                    }
+                    ...on TaskObjectiveItem {
+                        zones {
+                            map { normalizedName }
+                            position { x y z }
+                        }
+                    }
+                    ...on TaskObjectiveMark {
+                        zones {
+                            map { normalizedName }
+                            position { x y z }
+                        }
+                    }
+                    ...on TaskObjectiveQuestItem {
+                        zones {
+                            map { normalizedName }
+                            position { x y z }
+                        }
+                        possibleLocations {
+                            map { normalizedName }
+                            positions { x y z }
+                        }
+                    }
+                }
+            }
+    """
+    
+    def __init__(self, cache_ttl: int = 300, cache_dir: Optional[str] = None):
         """
         Initialize the API client.
         
         Args:
             cache_ttl: Cache time-to-live in seconds (default 5 minutes)
+            cache_dir: Directory for a persistent cache that survives restarts
+                (memory only if not given)
         """
         self.cache_ttl = cache_ttl
         self._cache: Dict[str, tuple[float, Any]] = {}
+        # Guards the memory and disk cache so one client can be shared by threads
+        self._lock = threading.RLock()
+        # Shared session so queries reuse pooled keep-alive connections.
+        # GraphQL reads are idempotent, so POSTs are safe to retry. Only
+        # gateway errors are retried; when offline a query fails at once.
+        self._session = requests.Session()
+        self._session.headers.update({'Content-Type': 'application/json'})
+        retry = Retry(
+            total=3,
+            connect=0,
+            read=0,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({'POST'})
+        )
+        self._session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry))
+        # Lowercase normalizedName -> map, built from the cached maps list
+        self._maps_by_name: Dict[str, Dict[str, Any]] = {}
+        self._maps_index_source: Optional[List[Dict[str, Any]]] = None
+        
+        self._db_path: Optional[Path] = None
+        if cache_dir:
+            self._db_path = Path(cache_dir) / "api_cache.sqlite"
+            try:
+                self._db_path.parent.mkdir(parents=True, exist_ok=True)
+                with closing(sqlite3.connect(self._db_path)) as conn, conn:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, ts REAL, payload BLOB)"
+                    )
+            except (OSError, sqlite3.Error) as e:
+                print(f"Disk cache unavailable: {e}")
+                self._db_path = None
     
     def _get_cached(self, key: str) -> Optional[Any]:
-        """Get cached value if not expired."""
-        if key in self._cache:
-            timestamp, value = self._cache[key]
-            if time.time() - timestamp < self.cache_ttl:
-                return value
-        return None
+        """Get cached value if not expired, falling back to the disk cache."""
+        with self._lock:
+            if key in self._cache:
+                timestamp, value = self._cache[key]
+                if time.time() - timestamp < self.cache_ttl:
+                    return value
+                return None
+            
+            if self._db_path:
+                try:
+                    with closing(sqlite3.connect(self._db_path)) as conn:
+                        row = conn.execute("SELECT ts, payload FROM cache WHERE key = ?", (key,)).fetchone()
+                except sqlite3.Error as e:
+                    print(f"Disk cache read error: {e}")
+                    return None
+                if row and time.time() - row[0] < self.cache_ttl:
+                    value = json.loads(zlib.decompress(row[1]))
+                    self._cache[key] = (row[0], value)
+                    return value
+            return None
     
     def _set_cache(self, key: str, value: Any):
         """Store value in cache with timestamp."""
-        self._cache[key] = (time.time(), value)
+        timestamp = time.time()
+        payload = zlib.compress(json.dumps(value).encode('utf-8')) if self._db_path else None
+        
+        with self._lock:
+            self._cache[key] = (timestamp, value)
+            
+            if payload is not None:
+                try:
+                    with closing(sqlite3.connect(self._db_path)) as conn, conn:
+                        conn.execute(
+                            "INSERT OR REPLACE INTO cache (key, ts, payload) VALUES (?, ?, ?)",
+                            (key, timestamp, payload)
+                        )
+                except sqlite3.Error as e:
+                    print(f"Disk cache write error: {e}")
     
     def _query(self, query: str, variables: Optional[Dict] = None) -> Optional[Dict]:
         """
@@ -50,10 +189,9 @@ class TarkovAPI:
             Response data dict or None on error
         """
         try:
-            response = requests.post(
+            response = self._session.post(
                 self.API_URL,
                 json={'query': query, 'variables': variables or {}},
-                headers={'Content-Type': 'application/json'},
                 timeout=30
             )
             response.raise_for_status()
@@ -77,24 +215,15 @@ class TarkovAPI:
         """
         cache_key = "maps"
         cached = self._get_cached(cache_key)
-        if cached:
+        if cached is not None:
             return cached
         
-        query = """
-        query {
-            maps {
-                id
-                name
-                normalizedName
-                wiki
-                description
-                enemies
-                raidDuration
-            }
-        }
-        """
+        # Cold cache: fetch maps and tasks together in one request. If that
+        # fails the API is unreachable, so no second maps-only query is sent.
+        if self._get_cached("quests_all") is None:
+            return self._get_cached(cache_key) if self._warm_all() else []
         
-        data = self._query(query)
+        data = self._query(f"query {{{self.MAPS_FIELDS}}}")
         if data and 'maps' in data:
             self._set_cache(cache_key, data['maps'])
             return data['maps']
@@ -112,82 +241,85 @@ class TarkovAPI:
         """
         cache_key = f"quests_{map_name or 'all'}"
         cached = self._get_cached(cache_key)
-        if cached:
+        if cached is not None:
             return cached
         
-        query = """
-        query {
-            tasks {
-                id
-                name
-                normalizedName
-                trader {
-                    name
-                }
-                map {
-                    name
-                    normalizedName
-                }
-                experience
-                objectives {
-                    id
-                    type
-                    description
-                    optional
-                    maps {
-                        name
-                        normalizedName
-                    }
-                    ...on TaskObjectiveBasic {
-                        zones {
-                            map { normalizedName }
-                            position { x y z }
-                        }
-                    }
-                    ...on TaskObjectiveItem {
-                        zones {
-                            map { normalizedName }
-                            position { x y z }
-                        }
-                    }
-                    ...on TaskObjectiveMark {
-                        zones {
-                            map { normalizedName }
-                            position { x y z }
-                        }
-                    }
-                    ...on TaskObjectiveQuestItem {
-                        zones {
-                            map { normalizedName }
-                            position { x y z }
-                        }
-                        possibleLocations {
-                            map { normalizedName }
-                            positions { x y z }
-                        }
-                    }
-                }
-            }
-        }
-        """
-        
-        data = self._query(query)
-        if not data or 'tasks' not in data:
-            return []
-        
-        quests = data['tasks']
-        
-        # Filter by map if specified
+        # Per-map lists are filtered from the full task list, so every map
+        # shares one network fetch
         if map_name:
             map_name_lower = map_name.lower()
             quests = [
-                q for q in quests
+                q for q in self.get_quests()
                 if q.get('map') and q['map'].get('normalizedName', '').lower() == map_name_lower
             ]
+            # An empty list from a failed fetch must not be cached as "no quests"
+            if self._get_cached("quests_all") is not None:
+                self._set_cache(cache_key, quests)
+            return quests
+        
+        # Cold cache: fetch maps and tasks together in one request
+        if self._get_cached("maps") is None:
+            return self._get_cached(cache_key) if self._warm_all() else []
+        
+        data = self._query(f"query {{{self.TASKS_FIELDS}}}")
+        if not data or 'tasks' not in data:
+            return []
         
+        quests = data['tasks']
         self._set_cache(cache_key, quests)
         return quests
     
+    def _warm_all(self) -> bool:
+        """
+        Fetch maps and tasks in a single batched GraphQL request and cache both.
+        
+        Returns:
+            True if both lists were fetched and cached
+        """
+        data = self._query(f"query {{{self.MAPS_FIELDS}{self.TASKS_FIELDS}}}")
+        if not data or 'maps' not in data or 'tasks' not in data:
+            return False
+        
+        self._set_cache("maps", data['maps'])
+        self._set_cache("quests_all", data['tasks'])
+        return True
+    
+    def prefetch(self, map_names: Optional[List[str]] = None):
+        """
+        Warm the cache with maps and quests in one request.
+        
+        No request is made when both are already cached, e.g. loaded from
+        the disk cache on a restart.
+        
+        Args:
+            map_names: Maps whose quest lists should also be prepared
+        """
+        if self._get_cached("maps") is None or self._get_cached("quests_all") is None:
+            self._warm_all()
+        
+        # Filtered from the cached task list, no further requests
+        for map_name in map_names or []:
+            self.get_quests(map_name)
+    
+    def get_all_for_map(self, map_name: str) -> Dict[str, Any]:
+        """
+        Get maps, quests and quest objective locations for a map together.
+        
+        On a cold cache this costs a single batched request, since maps and
+        quests are fetched together and objectives are derived from quests.
+        
+        Args:
+            map_name: Normalized map name (e.g., 'customs')
+            
+        Returns:
+            Dict with 'maps', 'quests' and 'objectives'
+        """
+        return {
+            'maps': self.get_maps(),
+            'quests': self.get_quests(map_name),
+            'objectives': self.get_quest_objectives_with_locations(map_name),
+        }
+    
     def get_map_data(self, map_name: str) -> Optional[Dict[str, Any]]:
         """
         Get detailed data for a specific map.
@@ -199,10 +331,12 @@ class TarkovAPI:
             Map data dict or None if not found
         """
         maps = self.get_maps()
-        for m in maps:
-            if m.get('normalizedName', '').lower() == map_name.lower():
-                return m
-        return None
+        # Rebuild the name index only when the cached maps list is replaced
+        if maps is not self._maps_index_source:
+            # Reversed so the first map with a given name wins, as in a scan
+            self._maps_by_name = {m.get('normalizedName', '').lower(): m for m in reversed(maps)}
+            self._maps_index_source = maps
+        return self._maps_by_name.get(map_name.lower())
     
     def get_items(self, category: Optional[str] = None) -> List[Dict[str, Any]]:
         """
@@ -216,7 +350,7 @@ class TarkovAPI:
         """
         cache_key = f"items_{category or 'all'}"
         cached = self._get_cached(cache_key)
-        if cached:
+        if cached is not None:
             return cached
         
         query = """
@@ -252,6 +386,24 @@ class TarkovAPI:
         self._set_cache(cache_key, items)
         return items
     
+    @staticmethod
+    def _objective_positions(obj: Dict[str, Any], map_lower: str) -> Iterator[Tuple[float, float]]:
+        """
+        Yield the (x, y) positions of an objective that lie on a map.
+        
+        Zones come first, then possible locations. Quests can span several
+        maps, so each zone/location is still checked against the map.
+        """
+        for zone in obj.get('zones') or []:
+            pos = zone.get('position')
+            if pos and zone.get('map', {}).get('normalizedName', '').lower() == map_lower:
+                yield pos['x'], pos['y']
+        
+        for loc in obj.get('possibleLocations') or []:
+            if loc.get('map', {}).get('normalizedName', '').lower() == map_lower:
+                for pos in loc.get('positions') or []:
+                    yield pos['x'], pos['y']
+    
     def get_quest_objectives_with_locations(self, map_name: str) -> List[Dict[str, Any]]:
         """
         Get quest objectives for a map with their locations.
@@ -264,40 +416,33 @@ class TarkovAPI:
             List of objectives with location data
         """
         quests = self.get_quests(map_name)
+        map_lower = map_name.lower()
         objectives_with_locations = []
         
         for quest in quests:
+            trader = quest.get('trader', {}).get('name', 'Unknown')
             for obj in quest.get('objectives', []):
-                coords = []
-                
-                # Extract coordinates from zones
-                for zone in obj.get('zones', []) or []:
-                    zone_map = zone.get('map', {}).get('normalizedName', '').lower()
-                    if zone_map == map_name.lower():
-                        pos = zone.get('position')
-                        if pos:
-                            coords.append({'x': pos['x'], 'y': pos['y']})
-                            
-                # Extract coordinates from possibleLocations
-                for loc in obj.get('possibleLocations', []) or []:
-                    loc_map = loc.get('map', {}).get('normalizedName', '').lower()
-                    if loc_map == map_name.lower():
-                        for pos in loc.get('positions', []) or []:
-                            coords.append({'x': pos['x'], 'y': pos['y']})
+                positions = list(self._objective_positions(obj, map_lower))
+                if not positions:
+                    continue
                 
-                # If we have coordinates, add them
-                for coord in coords:
-                    objectives_with_locations.append({
+                # Built once here so map rendering doesn't format it per marker
+                popup_html = f"<b>{html.escape(quest['name'])}</b><br>{html.escape(obj['description'])}"
+                objectives_with_locations.extend(
+                    {
                         'quest_id': quest['id'],
                         'quest_name': quest['name'],
                         'objective_id': obj['id'],
                         'objective_description': obj['description'],
                         'objective_type': obj['type'],
                         'optional': obj.get('optional', False),
-                        'trader': quest.get('trader', {}).get('name', 'Unknown'),
-                        'x': coord['x'],
-                        'y': coord['y']
-                    })
+                        'trader': trader,
+                        'x': x,
+                        'y': y,
+                        'popup_html': popup_html
+                    }
+                    for x, y in positions
+                )
         
         return objectives_with_locations
 
@@ -312,8 +457,28 @@ def get_active_quests(map_name: str = "customs") -> List[Dict[str, Any]]:
     Returns:
         List of quest data dicts
     """
-    api = TarkovAPI()
-    return api.get_quests(map_name)
+    return get_default_api().get_quests(map_name)
+
+
+_default_api: Optional[TarkovAPI] = None
+_default_api_lock = threading.Lock()
+
+
+def get_default_api() -> TarkovAPI:
+    """
+    Get the shared API client, creating it on first use.
+    
+    Sharing one client keeps its cache and pooled connections alive
+    across callers instead of starting cold every time.
+    
+    Returns:
+        Process-wide TarkovAPI instance
+    """
+    global _default_api
+    with _default_api_lock:
+        if _default_api is None:
+            _default_api = TarkovAPI()
+        return _default_api
 
 
 # Example usage and testing
@@ -3,149 +3,370 @@ Test Suite for Tarkov Map Tracker
 Comprehensive tests for all modules
 """
 
+import hashlib
+import importlib.util
 import os
-import sys
-import tempfile
+import re
 from pathlib import Path
+from unittest import mock
 
-def test_screenshot_parser():
-    """Test screenshot filename parsing."""
-    print("\n" + "="*50)
-    print("TEST: Screenshot Parser")
-    print("="*50)
+import pytest
+
+SNAPSHOTS_DIR = Path(__file__).parent / "snapshots"
+
+
+# Screenshot filenames and the position each should parse to (None = no match)
+SCREENSHOT_CASES = [
+    ("2025-12-27[15:20]_1234.56,789.01,2.34_45deg.png", (1234.56, 789.01, 2.34, 45)),
+    ("2025-12-27[15-20]_0,0,0_0deg.png", (0.0, 0.0, 0.0, 0)),
+    ("2024-01-05[09-03]_12.5,300,1.25_359deg.png", (12.5, 300.0, 1.25, 359)),
+    ("2024-01-05[09-03]_10.0,20.0,3.0_90DEG.PNG", (10.0, 20.0, 3.0, 90)),
+    ("2024-01-05[09-03]_7.5,8.5,9.5_180deg.png", (7.5, 8.5, 9.5, 180)),
+    ("2025-12-27[15-20].png", None),
+    ("2025-12-27[15-20]_1,2,3_45deg.jpg", None),
+    ("2025-12-27[15-20]_1,2,3_deg.png", None),
+]
+LATEST_SCREENSHOT = SCREENSHOT_CASES[0][0]
+
+
+@pytest.fixture(scope="session")
+def screenshot_dir(tmp_path_factory):
+    """Screenshots folder holding every test filename, created once per session."""
+    directory = tmp_path_factory.mktemp("screenshots")
+    for i, (filename, _) in enumerate(SCREENSHOT_CASES):
+        path = directory / filename
+        path.touch()
+        # Explicit mtimes so the latest screenshot is deterministic
+        mtime = 2_000_000_000 if filename == LATEST_SCREENSHOT else 1_000_000_000 + i
+        os.utime(path, (mtime, mtime))
+    return directory
+
+@pytest.fixture(scope="module")
+def parser(screenshot_dir):
+    """One ScreenshotParser shared by the screenshot tests."""
+    from screenshot_parser import ScreenshotParser
+    return ScreenshotParser(str(screenshot_dir))
+
+def test_screenshot_parser(parser):
+    """Test finding and parsing the latest screenshot."""
+    from screenshot_parser import ScreenshotParser
     
+    pos = parser.get_latest_position()
+    
+    assert pos is not None
+    assert pos['filename'] == LATEST_SCREENSHOT
+    assert pos['x'] == 1234.56
+    assert pos['y'] == 789.01
+    assert pos['z'] == 2.34
+    assert pos['rotation'] == 45
+    assert pos['timestamp'] == 2_000_000_000
+    
+    # Pattern is compiled once on the class and shared by all parsers
+    assert isinstance(ScreenshotParser.POSITION_PATTERN, re.Pattern)
+    assert parser.POSITION_PATTERN is ScreenshotParser.POSITION_PATTERN
+
+def test_watch_for_updates_reports_current(tmp_path):
+    """Test watching reports the current screenshot, then new ones, on the calling thread."""
+    import threading
     from screenshot_parser import ScreenshotParser
     
-    # Create temp directory with test screenshot
-    tmpdir = tempfile.mkdtemp()
-    testfile = os.path.join(tmpdir, '2025-12-27[15:20]_1234.56,789.01,2.34_45deg.png')
-    Path(testfile).touch()
+    class StopWatching(Exception):
+        pass
     
-    # Test parsing
-    parser = ScreenshotParser(tmpdir)
-    pos = parser.get_latest_position()
+    (tmp_path / "2025-12-27[15-20]_1,2,3_90deg.png").touch()
+    received = []
     
-    if pos and pos['x'] == 1234.56 and pos['y'] == 789.01 and pos['rotation'] == 45:
-        print("✅ PASSED - Screenshot parsing works correctly")
-        print(f"   Position: X={pos['x']}, Y={pos['y']}, Z={pos['z']}, Rotation={pos['rotation']}°")
-        return True
+    def callback(position):
+        received.append((position['rotation'], threading.current_thread()))
+        if len(received) == 1:
+            (tmp_path / "2025-12-27[15-21]_4,5,6_180deg.png").touch()
+        else:
+            # Callback errors propagate out of the watch loop
+            raise StopWatching
+    
+    with pytest.raises(StopWatching):
+        ScreenshotParser(str(tmp_path)).watch_for_updates(callback, interval=0.05)
+    
+    assert received == [(90, threading.current_thread()), (180, threading.current_thread())]
+
+def test_screenshot_watcher_repoint(tmp_path):
+    """Test changing the watched directory replaces the observer."""
+    from screenshot_parser import ScreenshotWatcher
+    
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    (second / "2025-12-27[15-20]_1,2,3_90deg.png").touch()
+    
+    watcher = ScreenshotWatcher(str(first))
+    try:
+        watcher.watch(str(first))
+        observer = watcher._observer
+        watcher.watch(str(first))
+        assert watcher._observer is observer
+        assert watcher.latest_position is None
+        
+        watcher.watch(str(second))
+        assert watcher._observer is not observer
+        assert not observer.is_alive()
+        assert watcher.latest_position['rotation'] == 90
+    finally:
+        watcher.stop()
+
+@pytest.mark.parametrize("filename,expected", SCREENSHOT_CASES)
+def test_parse_filename(parser, screenshot_dir, filename, expected):
+    """Test position parsing across filename variants."""
+    pos = parser.parse_filename(str(screenshot_dir / filename))
+    
+    if expected is None:
+        assert pos is None
     else:
-        print("❌ FAILED - Incorrect parsing")
-        return False
+        assert (pos['x'], pos['y'], pos['z'], pos['rotation']) == expected
+        assert pos['timestamp'] is not None
 
-def test_api_integration():
-    """Test Tarkov API connectivity."""
-    print("\n" + "="*50)
-    print("TEST: API Integration")
-    print("="*50)
+def test_api_integration(api):
+    """Test Tarkov API client against a recorded API response."""
+    maps = api.get_maps()
+    quests = api.get_quests("customs")
+    objectives = api.get_quest_objectives_with_locations("customs")
     
+    assert len(maps) > 0
+    assert len(quests) > 0
+    assert len(objectives) > 0
+    # Maps and tasks arrive in one batched request
+    assert api._session.post.call_count == 1
+
+def test_api_get_all_for_map(graphql_response):
+    """Test fetching everything for a map in one request."""
     from tarkov_api import TarkovAPI
     
-    api = TarkovAPI()
+    client = TarkovAPI()
+    with mock.patch.object(client._session, 'post', return_value=graphql_response) as post:
+        result = client.get_all_for_map("customs")
     
-    # Test maps retrieval
-    maps = api.get_maps()
-    print(f"✅ Retrieved {len(maps)} maps from API")
+    assert len(result["maps"]) > 0
+    assert len(result["quests"]) > 0
+    assert len(result["objectives"]) > 0
+    assert post.call_count == 1
+
+def test_api_cache(graphql_response):
+    """Test repeated reads, including empty results, are served from the cache."""
+    from tarkov_api import TarkovAPI
     
-    # Test quests retrieval
-    quests = api.get_quests("customs")
-    print(f"✅ Retrieved {len(quests)} Customs quests")
+    client = TarkovAPI()
+    with mock.patch.object(client._session, 'post', return_value=graphql_response) as post:
+        assert client.get_maps() is client.get_maps()
+        # Factory has no quests in the fixture; an empty list is still a hit
+        assert client.get_quests("factory") == []
+        with mock.patch.object(client, '_set_cache', wraps=client._set_cache) as set_cache:
+            assert client.get_quests("factory") == []
+        assert set_cache.call_count == 0
     
-    # Test quest objectives
-    objectives = api.get_quest_objectives_with_locations("customs")
-    print(f"✅ Retrieved {len(objectives)} quest objectives with locations")
+    assert post.call_count == 1
+
+def test_api_failed_fetch_not_cached(graphql_response, tmp_path):
+    """Test a map's quests are refetched once the API is reachable again."""
+    import requests
+    from tarkov_api import TarkovAPI
     
-    return len(maps) > 0 and len(quests) > 0
+    client = TarkovAPI(cache_dir=str(tmp_path))
+    with mock.patch.object(client._session, 'post', side_effect=requests.ConnectionError):
+        assert client.get_quests("customs") == []
+    
+    with mock.patch.object(client._session, 'post', return_value=graphql_response) as post:
+        assert len(client.get_quests("customs")) > 0
+    assert post.call_count == 1
 
-def test_map_renderer():
+def test_api_offline_single_request():
+    """Test an unreachable API costs one request, with no per-field fallback."""
+    import requests
+    from tarkov_api import TarkovAPI
+    
+    client = TarkovAPI()
+    with mock.patch.object(client._session, 'post', side_effect=requests.ConnectionError) as post:
+        assert client.get_maps() == []
+    assert post.call_count == 1
+
+def test_api_disk_cache(graphql_response, tmp_path):
+    """Test a second client on the same cache_dir starts without network."""
+    from tarkov_api import TarkovAPI
+    
+    first = TarkovAPI(cache_dir=str(tmp_path))
+    with mock.patch.object(first._session, 'post', return_value=graphql_response) as post:
+        first.prefetch(["customs"])
+    assert post.call_count == 1
+    
+    second = TarkovAPI(cache_dir=str(tmp_path))
+    with mock.patch.object(second._session, 'post', return_value=graphql_response) as post:
+        second.prefetch(["customs"])
+        assert len(second.get_maps()) > 0
+        assert len(second.get_quests("customs")) > 0
+    assert post.call_count == 0
+
+@pytest.mark.slow
+@pytest.mark.integration
+@pytest.mark.skipif(not os.environ.get("TARKOV_LIVE_API"), reason="set TARKOV_LIVE_API=1 to query api.tarkov.dev")
+def test_api_live():
+    """Test Tarkov API connectivity against the live endpoint (opt-in)."""
+    from tarkov_api import TarkovAPI
+    
+    api = TarkovAPI()
+    assert len(api.get_maps()) > 0
+    assert len(api.get_quests("customs")) > 0
+
+def test_map_renderer(renderer):
     """Test map rendering."""
-    print("\n" + "="*50)
-    print("TEST: Map Renderer")
-    print("="*50)
+    test_pos = {'x': 100.5, 'y': 200.3, 'z': 5.2, 'rotation': 45}
     
-    from map_renderer import MapRenderer
+    html = renderer.render_map('customs', level=1, player_position=test_pos)
     
-    renderer = MapRenderer()
+    assert isinstance(html, str)
+    assert "L.map('leaflet-map'" in html
+    assert '"lat": 200.3' in html and '"lng": 100.5' in html
+
+def test_map_renderer_snapshot(renderer):
+    """Test rendered map HTML against a stored hash (REGEN_SNAPSHOTS=1 to refresh)."""
     test_pos = {'x': 100.5, 'y': 200.3, 'z': 5.2, 'rotation': 45}
+    quests = [{'x': 12.0, 'y': -34.5, 'quest_name': 'Background Check'}]
     
-    try:
-        m = renderer.render_map('customs', level=1, player_position=test_pos)
-        m.save('test_map.html')
-        print("✅ PASSED - Map rendered successfully")
-        print("   Output: test_map.html")
-        return True
-    except Exception as e:
-        print(f"⚠️  WARNING - Map rendering had issues: {e}")
-        return False
+    html = renderer.render_map('customs', level=1, player_position=test_pos, quests=quests)
+    digest = hashlib.sha256(html.encode('utf-8')).hexdigest()
+    
+    snapshot = SNAPSHOTS_DIR / "customs_L1.sha256"
+    if os.environ.get("REGEN_SNAPSHOTS"):
+        SNAPSHOTS_DIR.mkdir(exist_ok=True)
+        snapshot.write_text(digest + "\n", encoding='utf-8')
+        return
+    if not snapshot.exists():
+        pytest.fail("snapshot missing: snapshots/customs_L1.sha256 "
+                    "(run with REGEN_SNAPSHOTS=1 to create it)")
+    
+    if digest != snapshot.read_text(encoding='utf-8').strip():
+        # Keep the differing output around for inspection
+        (SNAPSHOTS_DIR / "customs_L1.actual.html").write_text(html, encoding='utf-8')
+        pytest.fail("Rendered HTML changed; see snapshots/customs_L1.actual.html "
+                    "or rerun with REGEN_SNAPSHOTS=1 if the change is intended")
 
-def test_log_monitor():
-    """Test log monitor setup."""
-    print("\n" + "="*50)
-    print("TEST: Log Monitor")
-    print("="*50)
+def _reference_svg_coords(game_x, game_y, map_config):
+    """Bounds-percentage conversion as originally written, without the affine."""
+    bounds = map_config.get('bounds')
+    if not bounds or len(bounds) < 2:
+        return (game_x + 500), (500 - game_y)
+    min_x = min(bounds[0][0], bounds[1][0])
+    max_x = max(bounds[0][0], bounds[1][0])
+    min_y = min(bounds[0][1], bounds[1][1])
+    max_y = max(bounds[0][1], bounds[1][1])
+    range_x = max_x - min_x if max_x != min_x else 1000
+    range_y = max_y - min_y if max_y != min_y else 1000
+    return (game_x - min_x) / range_x * 100, (max_y - game_y) / range_y * 100
+
+def test_svg_coords_match_bounds_formula(renderer):
+    """Test the affine conversion against the plain bounds formula for every bundled map."""
+    configs = [config for entry in renderer.maps_config for config in entry.get('maps', [])]
+    configs.append({'key': 'no-bounds'})
+    assert len(configs) > 1
     
+    for config in configs:
+        for game_x, game_y in [(0.0, 0.0), (100.5, 200.3), (-321.0, 45.25)]:
+            expected = _reference_svg_coords(game_x, game_y, config)
+            actual = renderer._calculate_svg_coords(game_x, game_y, config, 800, 600)
+            assert actual == pytest.approx(expected), config.get('key')
+
+def test_log_monitor(tmp_path):
+    """Test log monitor setup."""
     from log_monitor import TarkovLogMonitor
     
-    try:
-        # Just test that we can create a monitor instance
-        tmpdir = tempfile.mkdtemp()
-        monitor = TarkovLogMonitor(tmpdir)
-        print("✅ PASSED - Log monitor initialized")
-        return True
-    except Exception as e:
-        print(f"❌ FAILED - {e}")
-        return False
+    monitor = TarkovLogMonitor(str(tmp_path))
+    assert monitor.current_map is None
 
-def test_module_imports():
-    """Test that all modules can be imported."""
-    print("\n" + "="*50)
-    print("TEST: Module Imports")
-    print("="*50)
+def test_log_monitor_rotation(tmp_path):
+    """Test only a new log of the tailed type is treated as a rotation."""
+    from log_monitor import TarkovLogMonitor
     
-    modules = ['screenshot_parser', 'log_monitor', 'tarkov_api', 'map_renderer']
-    all_passed = True
+    tailed = tmp_path / "2025.12.27_15-20-01_0.16.0 application_000.log"
+    tailed.touch()
+    monitor = TarkovLogMonitor(str(tmp_path))
+    monitor._open_log(str(tailed)).close()
     
-    for mod in modules:
-        try:
-            __import__(mod)
-            print(f"✅ {mod}")
-        except Exception as e:
-            print(f"❌ {mod}: {e}")
-            all_passed = False
+    # Sibling logs EFT writes in the same session folder
+    for name in ("2025.12.27_15-20-01_0.16.0 errors_000.log", "backend.log"):
+        (tmp_path / name).touch()
+        monitor._check_rotation(str(tmp_path / name), created=True)
+        assert monitor._pending_file is None
     
-    return all_passed
+    successor = tmp_path / "2025.12.27_15-20-01_0.16.0 application_001.log"
+    successor.touch()
+    monitor._check_rotation(str(successor), created=True)
+    assert monitor._pending_file == str(successor)
 
-if __name__ == "__main__":
-    print("\n" + "🧪 TARKOV MAP TRACKER TEST SUITE 🧪".center(50))
-    print("="*50)
+def test_log_monitor_tail_blocks(tmp_path):
+    """Test tailing holds back a partial line and dispatches each line once."""
+    from log_monitor import TarkovLogMonitor
     
-    results = {}
+    class StopTailing(Exception):
+        pass
     
-    # Run tests
-    results['Module Imports'] = test_module_imports()
-    results['Screenshot Parser'] = test_screenshot_parser()
-    results['API Integration'] = test_api_integration()
-    results['Map Renderer'] = test_map_renderer()
-    results['Log Monitor'] = test_log_monitor()
+    log = tmp_path / "application.log"
+    # Already in the log before tailing starts, so it is skipped
+    log.write_text("2025-12-27 15:19:00.000|Info|application|Map factory loaded\n", encoding='utf-8')
+    monitor = TarkovLogMonitor(str(tmp_path))
+    maps, raids = [], []
+    monitor.on_map_loaded(maps.append).on_raid_started(lambda: raids.append(True))
+    monitor._freeze_callbacks()
     
-    # Summary
-    print("\n" + "="*50)
-    print("TEST SUMMARY")
-    print("="*50)
+    def append(text):
+        with open(log, 'a', encoding='utf-8', newline='') as f:
+            f.write(text)
     
-    passed = sum(1 for v in results.values() if v)
-    total = len(results)
+    writes = iter([
+        "2025-12-27 15:20:01.123|Info|application|Map cus",
+        "toms loaded\n2025-12-27 15:20:02.000|Info|network|Ping\n"
+        "2025-12-27 15:21:00.000|Info|application|Started raid\n",
+    ])
+    states = []
     
-    for test, result in results.items():
-        status = "✅ PASS" if result else "❌ FAIL"
-        print(f"{status}: {test}")
+    def wait(timeout=None):
+        # Each time the reader runs dry, record what it has seen and write more
+        states.append((list(maps), len(raids), monitor._tail_buf, monitor.last_position))
+        try:
+            append(next(writes))
+        except StopIteration:
+            raise StopTailing
+        return True
     
-    print("="*50)
-    print(f"Results: {passed}/{total} tests passed")
+    with mock.patch.object(monitor._wake, 'wait', side_effect=wait):
+        monitor._tail_file(str(log))
     
-    if passed == total:
-        print("\n🎉 ALL TESTS PASSED! Application is ready to use.")
-    else:
-        print(f"\n⚠️  {total - passed} test(s) failed. Review output above.")
+    size = log.stat().st_size
+    first_line = len("2025-12-27 15:19:00.000|Info|application|Map factory loaded\n")
+    assert states == [
+        # Seeked to the end; nothing read yet
+        ([], 0, '', 0),
+        ([], 0, "2025-12-27 15:20:01.123|Info|application|Map cus", first_line + 48),
+        (["customs"], 1, '', size),
+    ]
+
+@pytest.mark.parametrize("line,expected", [
+    ("2025-12-27 15:20:01.123|Info|application|Map customs loaded\n", ("map_loaded", "customs")),
+    ("2025-12-27 15:20:02.456|Info|application|Quest completed: debut", ("quest_completed", "debut")),
+    ("2025-12-27 15:21:00.000|Info|application|Started raid", ("raid_started", None)),
+    ("2025-12-27 15:21:00.000|Info|network|Connection established", None),
+    ("", None),
+])
+def test_log_monitor_process_line(tmp_path, line, expected):
+    """Test parsing canned log lines without the file watcher."""
+    from log_monitor import TarkovLogMonitor
     
-    sys.exit(0 if passed == total else 1)
+    monitor = TarkovLogMonitor(str(tmp_path))
+    received = []
+    monitor.on_map_loaded(received.append)
+    
+    assert monitor._process_line(line) == expected
+    if expected and expected[0] == "map_loaded":
+        assert received == ["customs"]
+        assert monitor.current_map == "customs"
+
+@pytest.mark.parametrize("mod", ['screenshot_parser', 'log_monitor', 'tarkov_api', 'map_renderer'])
+def test_module_imports(mod):
+    """Test that all modules can be found without executing them."""
+    assert importlib.util.find_spec(mod) is not None